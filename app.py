@@ -2,23 +2,22 @@ import streamlit as st
 import pandas as pd
 import json
 import os
+import asyncio
 import tempfile
+import shutil
+import atexit
 import base64
+import hashlib
+import threading
+import concurrent.futures
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 from streamlit_agraph import agraph, Node, Edge, Config
-from kg_extractor import KnowledgeGraphExtractor
-from utils import get_color_by_entity_type
+from kg_extractor import KnowledgeGraphExtractor, ExtractionError
+from utils import get_color_by_entity_type, ENTITY_LABELS_HTML
 from pyvis.network import Network  # HTML 네트워크 그래프를 위한 pyvis 라이브러리 추가
 
-# 페이지 설정
-st.set_page_config(
-    page_title="지식 그래프(knowledge graph) 분석",
-    page_icon="🔍",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
-
-# CSS 스타일
-st.markdown("""
+# CSS 스타일 (정적 문자열)
+_CSS_BLOCK = """
 <style>
     .main-header {
         text-align: center;
@@ -54,7 +53,75 @@ st.markdown("""
         padding: 1rem;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+# pyvis 그래프 옵션 (노드 최소/최대 크기 수정)
+_PYVIS_OPTIONS_JSON = """
+{
+  "nodes": {
+    "shape": "circle",
+    "font": {"size": 20, "face": "Nanum Gothic"},
+    "scaling": {"min": 40, "max": 60},
+    "shadow": true
+  },
+  "edges": {
+    "font": {"size": 10, "face": "Nanum Gothic"},
+    "smooth": {"type": "dynamic"},
+    "arrows": {"to": {"enabled": true, "scaleFactor": 0.5}}
+  },
+  "physics": {
+    "hierarchicalRepulsion": {
+      "centralGravity": 0.5,
+      "nodeDistance": 120
+    },
+    "maxVelocity": 50,
+    "minVelocity": 0.1,
+    "solver": "hierarchicalRepulsion"
+  }
+}
+"""
+
+# 페이지 설정
+st.set_page_config(
+    page_title="지식 그래프(knowledge graph) 분석",
+    page_icon="🔍",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+# CSS 스타일
+st.markdown(_CSS_BLOCK, unsafe_allow_html=True)
+
+# 그래프 설정: 노드와 엣지의 크기 및 스타일 수정
+# (app.py는 매 rerun마다 다시 실행되므로 프로세스당 한 번만 생성되도록 cache_resource 사용)
+@st.cache_resource(show_spinner=False)
+def get_agraph_config():
+    return Config(
+        width="100%",
+        height=600,
+        directed=True,
+        physics=True,
+        hierarchical=False,
+        node={
+            "shape": "circle",
+            "font": {"size": 20, "face": "Nanum Gothic", "align": "center"},
+            "scaling": {"min": 40, "max": 60},
+            "shadow": True
+        },
+        edge={
+            "font": {"size": 10, "face": "Nanum Gothic"},
+            "smooth": {"type": "dynamic"},
+            "arrows": {"to": {"enabled": True, "scaleFactor": 0.7}}
+        },
+        interaction={
+            "hover": True,
+            "navigationButtons": True,
+            "keyboard": True,
+            "tooltipDelay": 300
+        }
+    )
+
+_AGRAPH_CONFIG = get_agraph_config()
 
 # 세션 상태 초기화
 if 'graph_data' not in st.session_state:
@@ -71,18 +138,166 @@ if 'text_input' not in st.session_state:
     st.session_state.text_input = ""
 if 'html_content' not in st.session_state:
     st.session_state.html_content = None
+if 'entities_csv_bytes' not in st.session_state:
+    st.session_state.entities_csv_bytes = None
+if 'relations_csv_bytes' not in st.session_state:
+    st.session_state.relations_csv_bytes = None
+if 'relations_with_info_csv_bytes' not in st.session_state:
+    st.session_state.relations_with_info_csv_bytes = None
+if 'agraph_nodes' not in st.session_state:
+    st.session_state.agraph_nodes = None
+if 'agraph_edges' not in st.session_state:
+    st.session_state.agraph_edges = None
+if 'last_analysis_key' not in st.session_state:
+    st.session_state.last_analysis_key = None
+if 'extraction_job' not in st.session_state:
+    st.session_state.extraction_job = None
+if 'out_dir' not in st.session_state:
+    # 세션마다 결과 저장 경로를 한 번만 만들고, 프로세스 종료 시 삭제
+    st.session_state.out_dir = tempfile.mkdtemp(prefix="kg_")
+    atexit.register(shutil.rmtree, st.session_state.out_dir, ignore_errors=True)
+
+# 추출기 생성 함수 (Gemini 클라이언트를 한 번만 초기화하여 재사용)
+@st.cache_resource(show_spinner=False)
+def get_extractor(model_name, temperature, api_key_hash, _api_key):
+    # API 키는 추출기 생성 시 해당 추출기 전용 Gemini 클라이언트에만 연결됨 (캐시 미스일 때만 실행)
+    # 결과 파일은 extract 호출 시 세션별 경로로 저장하므로 기본 경로는 임시 디렉토리 사용
+    return KnowledgeGraphExtractor(
+        api_key=_api_key,
+        model_name=model_name,
+        temperature=temperature,
+        output_dir=tempfile.gettempdir()
+    )
+
+# 지식 그래프 추출 함수 (동일 입력은 캐시된 결과 재사용)
+@st.cache_data(ttl=3600, max_entries=64, show_spinner=False)
+def extract_knowledge_graph(text, model_name, temperature, api_key_hash, _api_key, _output_dir, _on_progress=None):
+    # api_key_hash는 캐시 키 용도이며, 실제 키(_api_key), 저장 경로, 진행 상황 콜백은 해싱 대상에서 제외됨
+    extractor = get_extractor(model_name, temperature, api_key_hash, _api_key)
+    result = asyncio.run(extractor.extract_async(text, output_dir=_output_dir, on_progress=_on_progress))
+    if not result["success"]:
+        raise ExtractionError(result["message"])
+    return result
+
+# 백그라운드 추출용 스레드 풀 (프로세스당 하나)
+@st.cache_resource(show_spinner=False)
+def get_executor():
+    return concurrent.futures.ThreadPoolExecutor(max_workers=4)
+
+def run_with_script_ctx(ctx, func, *args, **kwargs):
+    # 작업 스레드에서도 st.cache_data가 스크립트 컨텍스트를 찾을 수 있도록 연결
+    add_script_run_ctx(threading.current_thread(), ctx)
+    return func(*args, **kwargs)
+
+# 추출 작업을 백그라운드 스레드에서 시작 (Gemini 호출 중에도 화면이 멈추지 않음)
+def start_extraction(text, model_name, temperature, api_key, output_dir, analysis_key):
+    progress = {"done": 0, "total": 0, "entities": 0, "relations": 0}
+    
+    def update_progress(done, total, data):
+        progress.update(done=done, total=total, entities=len(data["entities"]), relations=len(data["relations"]))
+    
+    future = get_executor().submit(
+        run_with_script_ctx,
+        get_script_run_ctx(),
+        extract_knowledge_graph,
+        text,
+        model_name,
+        temperature,
+        hashlib.sha256(api_key.encode()).hexdigest(),
+        api_key,
+        output_dir,
+        _on_progress=update_progress
+    )
+    return {"future": future, "progress": progress, "key": analysis_key}
+
+# 추출 결과를 세션 상태에 저장
+def store_result(result, analysis_key):
+    dataframes = result["dataframes"]
+    relations_with_info_df = dataframes.get("relations_with_info", st.session_state.relations_with_info_df)
+    
+    # 파생 데이터를 먼저 모두 만든 뒤 저장 (중간에 실패해도 세션 상태가 반쯤 바뀌지 않도록)
+    # 그래프 노드/엣지와 내보내기용 CSV는 추출 시 한 번만 생성
+    entity_titles = build_entity_titles(result["data"])
+    agraph_nodes, agraph_edges = build_agraph_elements(result["data"], entity_titles)
+    html_content = generate_html_graph(result["data"], entity_titles)
+    entities_csv_bytes = dataframe_to_csv_bytes(dataframes["entities"])
+    relations_csv_bytes = dataframe_to_csv_bytes(dataframes["relations"])
+    relations_with_info_csv_bytes = dataframe_to_csv_bytes(relations_with_info_df)
+    
+    st.session_state.graph_data = result["data"]
+    st.session_state.entities_df = dataframes["entities"]
+    st.session_state.relations_df = dataframes["relations"]
+    st.session_state.relations_with_info_df = relations_with_info_df
+    st.session_state.jsonl_content = result["jsonl_content"]
+    st.session_state.entities_csv_bytes = entities_csv_bytes
+    st.session_state.relations_csv_bytes = relations_csv_bytes
+    st.session_state.relations_with_info_csv_bytes = relations_with_info_csv_bytes
+    st.session_state.agraph_nodes = agraph_nodes
+    st.session_state.agraph_edges = agraph_edges
+    st.session_state.html_content = html_content
+    st.session_state.last_analysis_key = analysis_key
 
-# HTML 그래프 생성 함수 (pyvis)
-def generate_html_graph(graph_data):
-    net = Network(height="600px", width="100%", directed=True, notebook=True)
+# DataFrame을 CSV 바이트로 변환 (엑셀에서 한글이 깨지지 않도록 BOM 포함)
+def dataframe_to_csv_bytes(df):
+    if df is None:
+        return None
+    return df.to_csv(index=False, encoding='utf-8-sig').encode('utf-8-sig')
+
+# 노드 툴팁 문자열 생성 (추출 직후 한 번만 만들어 agraph와 pyvis 그래프에서 함께 사용)
+def build_entity_titles(graph_data):
+    return {
+        entity["id"]: f"유형: {entity['type']}<br>설명: {entity.get('description', '')}"
+        for entity in graph_data["entities"]
+    }
+
+# agraph 노드/엣지 생성 함수 (추출 직후 한 번만 호출)
+def build_agraph_elements(graph_data, entity_titles):
+    # 개체 유형별 색상은 유형 수만큼만 조회
+    colors = {entity_type: get_color_by_entity_type(entity_type)
+              for entity_type in {entity["type"] for entity in graph_data["entities"]}}
+    
+    # 개체 노드 생성 (size 40, 개체 유형별 색상 적용)
+    nodes = [
+        Node(
+            id=entity["id"],
+            label=entity["name"],
+            color=colors[entity["type"]],
+            size=40,
+            title=entity_titles[entity["id"]]
+        )
+        for entity in graph_data["entities"]
+    ]
+    
+    # 관계 엣지 생성 (색상 "#888" 지정)
+    edges = [
+        Edge(
+            source=relation["source"],
+            target=relation["target"],
+            label=relation["relation"],
+            title=relation.get("sentence", ""),
+            color="#888"
+        )
+        for relation in graph_data["relations"]
+    ]
+    return nodes, edges
+
+# HTML 그래프 생성 함수 (pyvis, 동일한 그래프 데이터는 캐시된 HTML 재사용)
+@st.cache_data(max_entries=32, show_spinner=False)
+def generate_html_graph(graph_data, _entity_titles):
+    # _entity_titles는 graph_data에서 파생된 값이므로 캐시 키에서 제외
+    net = Network(height="600px", width="100%", directed=True, notebook=False)
+    
+    # 개체 유형별 색상은 유형 수만큼만 조회
+    colors = {entity_type: get_color_by_entity_type(entity_type)
+              for entity_type in {entity["type"] for entity in graph_data["entities"]}}
     
     # 노드 추가 (크기 40, 개체 유형별 색상)
     for entity in graph_data["entities"]:
         net.add_node(
             entity["id"], 
             label=entity["name"],
-            title=f"유형: {entity['type']}<br>설명: {entity['description']}",
-            color=get_color_by_entity_type(entity["type"]),
+            title=_entity_titles[entity["id"]],
+            color=colors[entity["type"]],
             size=40
         )
     
@@ -98,43 +313,10 @@ def generate_html_graph(graph_data):
         )
     
     # 옵션 설정 (노드 최소/최대 크기 수정)
-    net.set_options("""
-    {
-      "nodes": {
-        "shape": "circle",
-        "font": {"size": 20, "face": "Nanum Gothic"},
-        "scaling": {"min": 40, "max": 60},
-        "shadow": true
-      },
-      "edges": {
-        "font": {"size": 10, "face": "Nanum Gothic"},
-        "smooth": {"type": "dynamic"},
-        "arrows": {"to": {"enabled": true, "scaleFactor": 0.5}}
-      },
-      "physics": {
-        "hierarchicalRepulsion": {
-          "centralGravity": 0.5,
-          "nodeDistance": 120
-        },
-        "maxVelocity": 50,
-        "minVelocity": 0.1,
-        "solver": "hierarchicalRepulsion"
-      }
-    }
-    """)
-    
-    # 임시 HTML 파일 생성
-    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.html')
-    net.save_graph(temp_file.name)
-    
-    # HTML 파일 읽기
-    with open(temp_file.name, 'r', encoding='utf-8') as f:
-        html_content = f.read()
-    
-    # 임시 파일 삭제
-    os.unlink(temp_file.name)
+    net.set_options(_PYVIS_OPTIONS_JSON)
     
-    return html_content
+    # 임시 파일 없이 메모리에서 HTML 생성
+    return net.generate_html(notebook=False)
 
 # 샘플 텍스트
 sample_text = """
@@ -149,6 +331,99 @@ sample_text = """
 이 행사는 대한민국 AI 기술 발전에 중요한 이정표가 될 것으로 전문가들은 평가했다.
 """
 
+# 입력 패널 버튼 콜백 (위젯 생성 전에 실행되므로 text_input 값을 바로 바꿀 수 있음)
+def load_sample_text():
+    st.session_state.text_input = sample_text
+
+def clear_input():
+    # 진행 중인 분석 취소 (이미 실행 중인 작업은 결과를 무시)
+    if st.session_state.extraction_job:
+        st.session_state.extraction_job["future"].cancel()
+        st.session_state.extraction_job = None
+    # 텍스트 입력 초기화
+    st.session_state.text_input = ""
+    # 분석 결과 초기화
+    st.session_state.graph_data = None
+    st.session_state.entities_df = None
+    st.session_state.relations_df = None
+    st.session_state.relations_with_info_df = None
+    st.session_state.jsonl_content = None
+    st.session_state.html_content = None
+    st.session_state.entities_csv_bytes = None
+    st.session_state.relations_csv_bytes = None
+    st.session_state.relations_with_info_csv_bytes = None
+    st.session_state.agraph_nodes = None
+    st.session_state.agraph_edges = None
+    st.session_state.last_analysis_key = None
+
+# 텍스트 입력 패널 (버튼 클릭이나 폼 제출 시 이 영역만 다시 그림)
+@st.fragment
+def text_input_panel():
+    col1, col2 = st.columns([3, 1])
+    
+    with col1:
+        # 입력 폼 (제출 전까지는 타이핑으로 인한 rerun이 발생하지 않음)
+        with st.form("analysis_form", border=False):
+            st.text_area(
+                "분석할 텍스트를 입력하세요",
+                key="text_input",
+                height=300,
+                placeholder="여기에 한국어 텍스트를 입력하세요..."
+            )
+            
+            # 분석 버튼 - 결과가 그래프와 다른 탭에도 반영되도록 전체 화면을 다시 그린 뒤 분석 실행
+            if st.form_submit_button("분석하기", type="primary", use_container_width=True):
+                st.session_state.analysis_requested = True
+                st.rerun()
+    
+    with col2:
+        st.markdown("<br><br>", unsafe_allow_html=True)
+        # 샘플 텍스트 불러오기 버튼
+        st.button("샘플 텍스트 불러오기", use_container_width=True, on_click=load_sample_text)
+        
+        # 입력 지우기 버튼 - 분석 결과도 모두 초기화되므로 전체 화면을 다시 그림
+        if st.button("입력 지우기", use_container_width=True, on_click=clear_input):
+            st.rerun()
+
+# 분석 진행 상황 패널 (작업이 끝날 때까지 0.5초마다 이 영역만 다시 그림)
+@st.fragment(run_every=0.5)
+def extraction_status():
+    job = st.session_state.extraction_job
+    if job is None:
+        return
+    
+    progress = job["progress"]
+    if not job["future"].done():
+        label = "지식 그래프를 생성하는 중입니다..."
+        if progress["total"]:
+            label += (f" ({progress['done']}/{progress['total']}) "
+                      f"개체 {progress['entities']}개, 관계 {progress['relations']}개")
+        st.status(label, state="running")
+        return
+    
+    st.session_state.extraction_job = None
+    try:
+        result = job["future"].result()
+        store_result(result, job["key"])
+        n_entities = len(result["data"]["entities"])
+        n_relations = len(result["data"]["relations"])
+        st.session_state.analysis_message = ("success", f"지식 그래프 추출 성공! 개체 {n_entities}개, 관계 {n_relations}개를 찾았습니다.")
+    except ExtractionError as e:
+        st.session_state.analysis_message = ("error", f"추출 실패: {e}")
+    except Exception as e:
+        st.session_state.analysis_message = ("error", f"오류 발생: {str(e)}")
+    
+    # 그래프와 다른 탭에 결과가 반영되도록 전체 화면을 다시 그림
+    st.rerun()
+
+# 그래프 시각화 패널 (세션 상태만 읽으므로 다른 위젯 변경과 독립적으로 다시 그림)
+@st.fragment
+def render_graph():
+    if not st.session_state.graph_data:
+        return
+    st.subheader("지식 그래프 시각화")
+    agraph(nodes=st.session_state.agraph_nodes, edges=st.session_state.agraph_edges, config=_AGRAPH_CONFIG)
+
 # 타이틀
 st.markdown('<h1 class="main-header">지식 그래프(knowledge graph) 분석</h1>', unsafe_allow_html=True)
 st.markdown('<p class="sub-header">텍스트를 입력하면 개체(Entity)와 관계(Relation)를 추출해 그래프로 시각화합니다.</p>', unsafe_allow_html=True)
@@ -161,9 +436,8 @@ with st.sidebar:
     
     # API 키 입력
     api_key = st.text_input("Gemini API 키", type="password", help="Google AI Studio에서 발급받은 API 키를 입력하세요.")
-    # API 키 저장 (이 키는 사용자가 직접 입력한 값이므로 외부에서 넣은 것으로 처리)
-    if api_key:
-        os.environ["GOOGLE_API_KEY"] = api_key
+    # 입력이 없으면 배포 환경 변수의 키 사용 (입력한 키는 환경 변수에 저장하지 않고 추출기에 직접 전달)
+    api_key = api_key or os.environ.get("GOOGLE_API_KEY", "")
     
     # Gemini 모델 설정
     st.subheader("모델 설정")
@@ -181,14 +455,14 @@ with st.sidebar:
     col1, col2 = st.columns(2)
     
     with col1:
-        st.markdown(f'<div class="entity-label" style="background-color: {get_color_by_entity_type("PERSON")}">인물</div>', unsafe_allow_html=True)
-        st.markdown(f'<div class="entity-label" style="background-color: {get_color_by_entity_type("ORGANIZATION")}">조직</div>', unsafe_allow_html=True)
-        st.markdown(f'<div class="entity-label" style="background-color: {get_color_by_entity_type("LOCATION")}">장소</div>', unsafe_allow_html=True)
+        st.markdown(ENTITY_LABELS_HTML["PERSON"], unsafe_allow_html=True)
+        st.markdown(ENTITY_LABELS_HTML["ORGANIZATION"], unsafe_allow_html=True)
+        st.markdown(ENTITY_LABELS_HTML["LOCATION"], unsafe_allow_html=True)
     
     with col2:
-        st.markdown(f'<div class="entity-label" style="background-color: {get_color_by_entity_type("EVENT")}">이벤트</div>', unsafe_allow_html=True)
-        st.markdown(f'<div class="entity-label" style="background-color: {get_color_by_entity_type("PRODUCT")}">제품</div>', unsafe_allow_html=True)
-        st.markdown(f'<div class="entity-label" style="background-color: {get_color_by_entity_type("OTHER")}">기타</div>', unsafe_allow_html=True)
+        st.markdown(ENTITY_LABELS_HTML["EVENT"], unsafe_allow_html=True)
+        st.markdown(ENTITY_LABELS_HTML["PRODUCT"], unsafe_allow_html=True)
+        st.markdown(ENTITY_LABELS_HTML["OTHER"], unsafe_allow_html=True)
     
     # 저작권 정보
     st.sidebar.markdown("""
@@ -202,136 +476,46 @@ with st.sidebar:
 tab1, tab2, tab3 = st.tabs(["📝 텍스트 입력", "📊 데이터 보기", "📥 내보내기"])
 
 with tab1:
-    col1, col2 = st.columns([3, 1])
+    text_input_panel()
+    text_input = st.session_state.text_input
     
-    with col1:
-        # 샘플 텍스트 또는 이전 입력을 기본값으로 사용
-        text_input = st.text_area(
-            "분석할 텍스트를 입력하세요",
-            value=st.session_state.get("text_input", sample_text),
-            height=300,
-            placeholder="여기에 한국어 텍스트를 입력하세요..."
-        )
-    
-    with col2:
-        st.markdown("<br><br>", unsafe_allow_html=True)
-        # 샘플 텍스트 불러오기 버튼
-        if st.button("샘플 텍스트 불러오기", use_container_width=True):
-            st.session_state.text_input = sample_text
-            st.experimental_rerun()
+    # 분석 요청 처리
+    if st.session_state.pop("analysis_requested", False):
+        # 직전 분석과 같은 입력인지 확인하기 위한 키
+        analysis_key = hashlib.blake2b(f"{text_input}|{model_name}|{temperature}".encode(), digest_size=16).hexdigest()
         
-        # 입력 지우기 버튼 - 분석 결과도 모두 초기화되도록 개선
-        if st.button("입력 지우기", use_container_width=True):
-            # 텍스트 입력 초기화
-            st.session_state.text_input = ""
-            # 분석 결과 초기화
-            st.session_state.graph_data = None
-            st.session_state.entities_df = None
-            st.session_state.relations_df = None
-            st.session_state.relations_with_info_df = None
-            st.session_state.jsonl_content = None
-            st.session_state.html_content = None
-            st.experimental_rerun()
-    
-    # 분석 버튼
-    if st.button("분석하기", type="primary", use_container_width=True):
         if not text_input:
             st.error("텍스트를 입력해주세요.")
-        elif not api_key and not os.environ.get("GOOGLE_API_KEY"):
+        elif not api_key:
             st.error("Gemini API 키를 입력해주세요.")
+        elif analysis_key == st.session_state.last_analysis_key and st.session_state.graph_data:
+            st.info("직전 분석과 동일한 입력입니다. 기존 결과를 그대로 사용합니다.")
         else:
-            with st.spinner("지식 그래프를 생성하는 중입니다..."):
-                try:
-                    temp_dir = tempfile.mkdtemp()
-                    extractor = KnowledgeGraphExtractor(
-                        api_key=api_key,
-                        model_name=model_name,
-                        temperature=temperature,
-                        output_dir=temp_dir
-                    )
-                    
-                    result = extractor.extract(text_input)
-                    
-                    if result["success"]:
-                        st.session_state.graph_data = result["data"]
-                        st.session_state.entities_df = result["dataframes"]["entities"]
-                        st.session_state.relations_df = result["dataframes"]["relations"]
-                        if "relations_with_info" in result["dataframes"]:
-                            st.session_state.relations_with_info_df = result["dataframes"]["relations_with_info"]
-                        with open(result["jsonl_path"], 'r', encoding='utf-8') as f:
-                            st.session_state.jsonl_content = f.read()
-                        
-                        # HTML 그래프 생성
-                        st.session_state.html_content = generate_html_graph(result["data"])
-                            
-                        n_entities = len(result["data"]["entities"])
-                        n_relations = len(result["data"]["relations"])
-                        
-                        st.success(f"지식 그래프 추출 성공! 개체 {n_entities}개, 관계 {n_relations}개를 찾았습니다.")
-                        st.balloons()
-                    else:
-                        st.error(f"추출 실패: {result['message']}")
-                except Exception as e:
-                    st.error(f"오류 발생: {str(e)}")
+            st.session_state.extraction_job = start_extraction(
+                text_input,
+                model_name,
+                temperature,
+                api_key,
+                st.session_state.out_dir,
+                analysis_key
+            )
+    
+    # 진행 중인 분석 상태 표시
+    if st.session_state.extraction_job:
+        extraction_status()
+    
+    # 완료된 분석 결과 메시지 표시
+    analysis_message = st.session_state.pop("analysis_message", None)
+    if analysis_message:
+        level, message = analysis_message
+        if level == "success":
+            st.success(message)
+            st.balloons()
+        else:
+            st.error(message)
     
     # 그래프 시각화
-    if st.session_state.graph_data:
-        st.subheader("지식 그래프 시각화")
-        
-        nodes = []
-        edges = []
-        
-        # 개체 노드 생성 (size 40, 개체 유형별 색상 적용)
-        for entity in st.session_state.graph_data["entities"]:
-            nodes.append(
-                Node(
-                    id=entity["id"],
-                    label=entity["name"],
-                    color=get_color_by_entity_type(entity["type"]),
-                    size=40,
-                    title=f"유형: {entity['type']}<br>설명: {entity['description']}"
-                )
-            )
-        
-        # 관계 엣지 생성 (색상 "#888" 지정)
-        for relation in st.session_state.graph_data["relations"]:
-            edges.append(
-                Edge(
-                    source=relation["source"],
-                    target=relation["target"],
-                    label=relation["relation"],
-                    title=relation.get("sentence", ""),
-                    color="#888"
-                )
-            )
-        
-        # 그래프 설정: 노드와 엣지의 크기 및 스타일 수정
-        config = Config(
-            width="100%",
-            height=600,
-            directed=True,
-            physics=True,
-            hierarchical=False,
-            node={
-                "shape": "circle",
-                "font": {"size": 20, "face": "Nanum Gothic", "align": "center"},
-                "scaling": {"min": 40, "max": 60},
-                "shadow": True
-            },
-            edge={
-                "font": {"size": 10, "face": "Nanum Gothic"},
-                "smooth": {"type": "dynamic"},
-                "arrows": {"to": {"enabled": True, "scaleFactor": 0.7}}
-            },
-            interaction={
-                "hover": True,
-                "navigationButtons": True,
-                "keyboard": True,
-                "tooltipDelay": 300
-            }
-        )
-        
-        agraph(nodes=nodes, edges=edges, config=config)
+    render_graph()
 
 with tab2:
     if st.session_state.graph_data:
@@ -353,31 +537,28 @@ with tab3:
         st.subheader("데이터 내보내기")
         col1, col2, col3 = st.columns(3)
         with col1:
-            if st.session_state.entities_df is not None:
-                entities_csv = st.session_state.entities_df.to_csv(index=False, encoding='utf-8-sig').encode('utf-8-sig')
+            if st.session_state.entities_csv_bytes is not None:
                 st.download_button(
                     label="개체 CSV 다운로드",
-                    data=entities_csv,
+                    data=st.session_state.entities_csv_bytes,
                     file_name="entities.csv",
                     mime="text/csv",
                     use_container_width=True
                 )
         with col2:
-            if st.session_state.relations_df is not None:
-                relations_csv = st.session_state.relations_df.to_csv(index=False, encoding='utf-8-sig').encode('utf-8-sig')
+            if st.session_state.relations_csv_bytes is not None:
                 st.download_button(
                     label="관계 CSV 다운로드",
-                    data=relations_csv,
+                    data=st.session_state.relations_csv_bytes,
                     file_name="relations.csv",
                     mime="text/csv",
                     use_container_width=True
                 )
         with col3:
-            if st.session_state.relations_with_info_df is not None:
-                relations_info_csv = st.session_state.relations_with_info_df.to_csv(index=False, encoding='utf-8-sig').encode('utf-8-sig')
+            if st.session_state.relations_with_info_csv_bytes is not None:
                 st.download_button(
                     label="관계정보 CSV 다운로드",
-                    data=relations_info_csv,
+                    data=st.session_state.relations_with_info_csv_bytes,
                     file_name="relations_with_info.csv",
                     mime="text/csv",
                     use_container_width=True
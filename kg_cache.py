@@ -0,0 +1,98 @@
+import os
+import orjson
+import time
+import struct
+import hashlib
+import tempfile
+from typing import Dict, Any, Optional
+
+class ExtractionCache:
+    """LLM 추출 결과 캐시
+    - 모델명, temperature, 프롬프트 버전, 텍스트로 만든 SHA-256 키를 기준으로 결과를 디스크에 저장합니다.
+    """
+
+    def __init__(self, cache_dir: str):
+        """
+        초기화 함수
+
+        매개변수:
+            cache_dir (str): 캐시 파일 저장 경로
+        """
+        self.cache_dir = cache_dir
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(model_name: str, temperature: float, prompt_version: str, text: str) -> str:
+        """
+        캐시 키 생성 (필드마다 길이를 앞에 붙여 필드 경계가 섞이지 않도록 함)
+
+        매개변수:
+            model_name (str): Gemini 모델명
+            temperature (float): 생성 다양성 값
+            prompt_version (str): 프롬프트 버전 (프롬프트가 바뀌면 이전 캐시를 사용하지 않음)
+            text (str): 분석할 텍스트
+
+        반환값:
+            str: 16진수 SHA-256 키
+        """
+        fields = (
+            b"gemini",
+            model_name.encode("utf-8"),
+            struct.pack("<d", float(temperature)),
+            prompt_version.encode("utf-8"),
+            text.encode("utf-8"),
+        )
+        digest = hashlib.sha256()
+        for field in fields:
+            digest.update(struct.pack("<Q", len(field)))
+            digest.update(field)
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        캐시된 추출 결과 조회
+
+        매개변수:
+            key (str): 캐시 키
+
+        반환값:
+            dict: 개체와 관계 정보 (없거나 읽을 수 없으면 None)
+        """
+        try:
+            with open(self._path(key), 'rb') as f:
+                cached = orjson.loads(f.read())
+            return {"entities": cached["entities"], "relations": cached["relations"]}
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def set(self, key: str, data: Dict[str, Any], model_name: str = "") -> None:
+        """
+        추출 결과 저장 (임시 파일에 쓴 뒤 교체하여 동시에 읽어도 깨진 파일이 보이지 않도록 함)
+        저장에 실패해도 예외를 발생시키지 않습니다.
+
+        매개변수:
+            key (str): 캐시 키
+            data (dict): 저장할 개체와 관계 정보
+            model_name (str): 메타 정보로 남길 모델명
+        """
+        path = self._path(key)
+        payload = {
+            "entities": data.get("entities", []),
+            "relations": data.get("relations", []),
+            "meta": {"ts": time.time(), "model": model_name}
+        }
+        temp_path = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, 'wb') as f:
+                f.write(orjson.dumps(payload))
+            os.replace(temp_path, path)
+        except OSError as e:
+            # 캐시 저장 실패는 추출 결과에 영향을 주지 않음
+            print(f"캐시 저장 중 오류 발생: {e}")
+            if temp_path and os.path.exists(temp_path):
+                os.unlink(temp_path)
@@ -1,16 +1,57 @@
 import os
+import csv
 import json
 import re
+import orjson
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
-import google.generativeai as genai
-from typing import Dict, Any
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+from typing import Dict, Any, List
+from kg_cache import ExtractionCache
+
+# 프롬프트 버전 (프롬프트를 수정하면 올려서 이전 캐시를 무효화)
+PROMPT_VERSION = "1"
+
+# DataFrame 컬럼 구성 (값은 모두 짧은 문자열이므로 Arrow 기반 문자열 타입 사용)
+STRING_DTYPE = "string[pyarrow]"
+# CSV 파일 앞에 붙이는 UTF-8 BOM
+UTF8_BOM = b"\xef\xbb\xbf"
+# 이 행 수보다 작은 DataFrame은 csv 모듈로 바로 저장 (Arrow 변환 비용이 더 큼)
+SMALL_CSV_ROWS = 2000
+ENTITY_COLUMNS = ["id", "name", "type", "description"]
+RELATION_COLUMNS = ["source", "target", "relation", "sentence"]
+RELATION_INFO_COLUMNS = ["source_id", "source_name", "source_type", "target_id", "target_name", "target_type", "relation", "sentence"]
+# 빈 DataFrame 템플릿 (호출자가 결과를 수정해도 다른 추출에 영향이 없도록 항상 복사본을 반환)
+_EMPTY_ENTITIES_DF = pd.DataFrame(columns=ENTITY_COLUMNS, dtype=STRING_DTYPE)
+_EMPTY_RELATIONS_DF = pd.DataFrame(columns=RELATION_COLUMNS, dtype=STRING_DTYPE)
+_EMPTY_RELATION_INFO_DF = pd.DataFrame(columns=RELATION_INFO_COLUMNS, dtype=STRING_DTYPE)
+
+# genai.configure는 프로세스 전역 설정을 바꾸므로, 설정과 클라이언트 연결을 한 번에 하도록 잠금
+_GENAI_CONFIGURE_LOCK = threading.Lock()
+
+# 문단 경계 (줄바꿈과 앞뒤 공백)
+_PARAGRAPH_SPLIT = re.compile(r'\s*\n\s*')
+# 문장 경계 (마침표, 물음표, 느낌표 뒤의 공백)
+_SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+')
+# 응답의 JSON 객체 디코더 (코드 블록 여부와 관계없이 첫 중괄호부터 객체 하나만 해석)
+_JSON_DECODER = json.JSONDecoder()
+
+class ExtractionError(Exception):
+    """추출 실패 결과를 캐시하지 않기 위해 사용하는 예외
+    - 앱 스크립트는 다시 실행될 때마다 클래스를 새로 정의하므로, 작업 스레드와 결과 확인 쪽이
+      같은 클래스를 쓰도록 한 번만 로드되는 이 모듈에 정의합니다.
+    """
 
 class KnowledgeGraphExtractor:
     """지식 그래프 데이터 추출기 
     - Gemini 기반으로 개체(엔티티)와 관계를 추출하여 JSONL과 CSV 파일(entities, relations, relations_with_info)을 생성합니다.
     """
     
-    def __init__(self, api_key=None, model_name="models/gemini-2.0-pro-exp-02-05", temperature=0.2, output_dir="./output"):
+    def __init__(self, api_key=None, model_name="models/gemini-2.0-pro-exp-02-05", temperature=0.2, output_dir="./output",
+                 max_chunk_chars=4000, max_concurrency=8, cache_dir=None):
         """
         초기화 함수
         
@@ -19,11 +60,70 @@ class KnowledgeGraphExtractor:
             model_name (str): 사용할 Gemini 모델명
             temperature (float): 생성 다양성 조절 (0에 가까울수록 일관된 결과)
             output_dir (str): 결과 파일 저장 경로
+            max_chunk_chars (int): 한 번의 요청에 담을 최대 글자 수 (이보다 긴 텍스트만 나누어 병렬 요청)
+            max_concurrency (int): 동시에 보낼 수 있는 최대 Gemini 요청 수
+            cache_dir (str): LLM 응답 캐시 저장 경로 (없으면 캐시 사용 안 함)
         """
         self.api_key = api_key or os.environ.get("GOOGLE_API_KEY")
         self.model_name = model_name
         self.temperature = temperature
         self.output_dir = output_dir
+        self.max_chunk_chars = max_chunk_chars
+        self.max_concurrency = max_concurrency
+        self.cache = ExtractionCache(cache_dir) if cache_dir else None
+        
+        # 프롬프트에서 분석할 텍스트 앞뒤의 고정 부분 (한 번만 생성)
+        self._prompt_prefix = """
+        당신은 한국어 텍스트에서 개체(엔티티)와 관계를 추출하는 전문가입니다.
+        다음 텍스트에서 모든 중요한 개체(인물, 조직, 장소 등)와 그들 간의 관계를 추출해주세요.
+        
+        다음 규칙을 반드시 따라주세요:
+        1. 개체는 명확한 고유명사(인물, 조직, 장소 등)만 추출하세요.
+        2. 일반 명사, 동사, 형용사, 부사 등은 개체로 추출하지 마세요.
+        3. 관계는 두 개체 간의 의미 있는 연결을 나타내야 합니다.
+        4. 각 개체에는 고유 ID를 부여하고, 개체명, 유형, 설명을 포함해주세요.
+        5. 각 관계에는 소스 개체 ID, 타겟 개체 ID, 관계 유형, 관련 문장을 포함해주세요.
+        
+        개체 유형은 다음과 같이 분류해주세요:
+        - PERSON: 사람, 인물
+        - ORGANIZATION: 회사, 정부, 기관, 단체 등
+        - LOCATION: 국가, 도시, 지역 등
+        - EVENT: 행사, 사건, 회의 등
+        - PRODUCT: 제품, 서비스, 기술 등
+        - OTHER: 기타 중요 개체
+        
+        다음 형식의 JSON으로 응답해주세요:
+        ```json
+        {
+            "entities": [
+                {
+                    "id": "E1",
+                    "name": "김민수",
+                    "type": "PERSON",
+                    "description": "서울대학교 컴퓨터공학과 교수"
+                },
+                ...
+            ],
+            "relations": [
+                {
+                    "source": "E1",
+                    "target": "E2",
+                    "relation": "소속",
+                    "sentence": "김민수 교수는 서울대학교 컴퓨터공학과 소속이다."
+                },
+                ...
+            ]
+        }
+        ```
+        
+        분석할 텍스트:
+        ---
+        """
+        self._prompt_suffix = """
+        ---
+        
+        중요: 응답은 반드시 위에 명시된 JSON 형식만 포함해야 합니다. 다른 텍스트나 설명은 포함하지 마세요.
+        """
         
         # 출력 디렉토리 생성
         os.makedirs(self.output_dir, exist_ok=True)
@@ -31,11 +131,20 @@ class KnowledgeGraphExtractor:
         # Gemini API 설정 (API 키가 반드시 필요)
         if not self.api_key:
             raise ValueError("Google API 키가 설정되어 있지 않습니다.")
-        genai.configure(api_key=self.api_key)
+        # Gemini SDK는 추출기를 만들 때만 불러옴 (통계·내보내기만 쓰는 경우 import 비용 절약)
+        import google.generativeai as genai
+        from google.generativeai.client import get_default_generative_client
+        self.generation_config = genai.types.GenerationConfig(temperature=self.temperature)
         self.model = genai.GenerativeModel(
             model_name=self.model_name,
-            generation_config={"temperature": self.temperature}
+            generation_config=self.generation_config
         )
+        # GenerativeModel은 첫 호출 때 그 시점의 전역 설정으로 클라이언트를 만들기 때문에,
+        # 다른 키로 만든 추출기가 먼저 configure하면 이 추출기가 그 키를 쓰게 됨.
+        # 잠금 안에서 이 키로 설정한 직후 클라이언트를 만들어 모델에 고정 (이후 모든 요청이 같은 gRPC 채널 사용)
+        with _GENAI_CONFIGURE_LOCK:
+            genai.configure(api_key=self.api_key, transport="grpc")
+            self.model._client = get_default_generative_client()
 
 
     def extract(self, text, output_dir=None):
@@ -52,14 +161,96 @@ class KnowledgeGraphExtractor:
         output_dir = output_dir or self.output_dir
         os.makedirs(output_dir, exist_ok=True)
         
-        # Gemini API를 사용하여 개체 및 관계 추출
-        data = self._extract_with_llm(text)
+        # Gemini API를 사용하여 개체 및 관계 추출 (max_chunk_chars 이하는 나누지 않고 한 번만 호출)
+        chunks = self._split_text(text)
+        if not chunks:
+            # 공백뿐인 텍스트
+            data = None
+        elif len(chunks) == 1:
+            data = self._extract_with_llm(chunks[0])
+        else:
+            # 긴 텍스트는 청크별로 병렬 요청 (네트워크 IO 동안 GIL 해제)
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(chunks))) as executor:
+                results = list(executor.map(self._extract_with_llm, chunks))
+            data = self._merge_results(results)
         
+        return self._build_result(data, output_dir)
+    
+    async def extract_async(self, text, output_dir=None, on_progress=None):
+        """
+        텍스트를 청크로 나누어 (max_chunk_chars보다 긴 경우만) 병렬로 지식그래프 데이터를 추출하고 저장
+        
+        매개변수:
+            text (str): 분석할 텍스트
+            output_dir (str): 결과 저장 경로 (없으면 기본 경로 사용)
+            on_progress (callable): 청크가 끝날 때마다 (완료 수, 전체 수, 병합 결과)로 호출되는 함수
+            
+        반환값:
+            dict: 결과 데이터와 파일 경로 포함 (extract와 동일한 형식)
+        """
+        output_dir = output_dir or self.output_dir
+        os.makedirs(output_dir, exist_ok=True)
+        
+        data = None
+        async for done, total, data in self.extract_stream(text):
+            if on_progress:
+                on_progress(done, total, data)
+        
+        return self._build_result(data, output_dir)
+    
+    async def extract_stream(self, text):
+        """
+        청크별 추출이 끝날 때마다 지금까지의 병합 결과를 전달하는 비동기 제너레이터
+        
+        매개변수:
+            text (str): 분석할 텍스트
+            
+        반환값(yield):
+            tuple: (완료된 청크 수, 전체 청크 수, 지금까지 병합된 개체와 관계 정보)
+        """
+        chunks = self._split_text(text)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def run(index, chunk):
+            # 동기 Gemini 호출을 스레드에서 실행 (네트워크 IO 동안 GIL 해제)
+            async with semaphore:
+                return index, await asyncio.to_thread(self._extract_with_llm, chunk)
+        
+        results = [None] * len(chunks)
+        tasks = [run(index, chunk) for index, chunk in enumerate(chunks)]
+        for done, task in enumerate(asyncio.as_completed(tasks), start=1):
+            index, result = await task
+            results[index] = result
+            # 완료 순서와 관계없이 원문 순서대로 병합하여 ID가 일정하게 유지되도록 함
+            completed = [r for r in results if r is not None]
+            data = completed[0] if len(chunks) == 1 else self._merge_results(completed)
+            yield done, len(chunks), data
+    
+    def _build_result(self, data: Dict[str, Any], output_dir: str) -> Dict[str, Any]:
+        """
+        추출된 데이터로 JSONL/CSV 파일과 DataFrame을 생성
+        
+        매개변수:
+            data (dict): 추출된 개체와 관계 정보
+            output_dir (str): 저장 경로
+            
+        반환값:
+            dict: 결과 데이터와 파일 경로 포함
+        """
+        # 일부 청크라도 실패하면 불완전한 그래프를 성공으로 돌려주지 않음
+        if data and data.get("error"):
+            if data.get("chunk_count", 1) > 1:
+                message = (f"Gemini 요청 {data['chunk_count']}개 중 {data['failed_chunks']}개의 추출에 실패했습니다: "
+                           f"{data['error']}")
+            else:
+                message = f"Gemini 추출에 실패했습니다: {data['error']}"
+            return {"success": False, "message": message}
         if not data or not data.get("entities"):
             return {"success": False, "message": "개체 추출에 실패했습니다"}
         
         # JSONL 파일 저장
-        jsonl_path = self._save_jsonl(data, output_dir)
+        jsonl_bytes = self._to_jsonl(data)
+        jsonl_path = self._save_jsonl(jsonl_bytes, output_dir)
         
         # 데이터프레임 생성
         dataframes = self._create_dataframes(data)
@@ -71,87 +262,125 @@ class KnowledgeGraphExtractor:
             "success": True, 
             "data": data,
             "jsonl_path": jsonl_path,
+            "jsonl_content": jsonl_bytes.decode("utf-8"),
             "dataframe_paths": dataframe_paths,
             "dataframes": dataframes
         }
     
-    def _extract_with_llm(self, text):
+    def _split_text(self, text: str) -> List[str]:
         """
-        Gemini 모델을 사용하여 개체 및 관계 추출
+        텍스트를 max_chunk_chars 이하의 청크로 분할
+        - 문단(줄) 단위로 모으고, 한 문단이 max_chunk_chars보다 길면 문장 경계에서 나눕니다.
+        - extract와 extract_stream이 같은 기준으로 나누도록 두 경로 모두 이 함수를 사용합니다.
         
         매개변수:
             text (str): 분석할 텍스트
             
         반환값:
-            dict: 추출된 개체와 관계 정보
+            list: 청크 문자열 목록 (max_chunk_chars 이하의 텍스트는 원문 하나)
         """
-        prompt = f"""
-        당신은 한국어 텍스트에서 개체(엔티티)와 관계를 추출하는 전문가입니다.
-        다음 텍스트에서 모든 중요한 개체(인물, 조직, 장소 등)와 그들 간의 관계를 추출해주세요.
-        
-        다음 규칙을 반드시 따라주세요:
-        1. 개체는 명확한 고유명사(인물, 조직, 장소 등)만 추출하세요.
-        2. 일반 명사, 동사, 형용사, 부사 등은 개체로 추출하지 마세요.
-        3. 관계는 두 개체 간의 의미 있는 연결을 나타내야 합니다.
-        4. 각 개체에는 고유 ID를 부여하고, 개체명, 유형, 설명을 포함해주세요.
-        5. 각 관계에는 소스 개체 ID, 타겟 개체 ID, 관계 유형, 관련 문장을 포함해주세요.
-        
-        개체 유형은 다음과 같이 분류해주세요:
-        - PERSON: 사람, 인물
-        - ORGANIZATION: 회사, 정부, 기관, 단체 등
-        - LOCATION: 국가, 도시, 지역 등
-        - EVENT: 행사, 사건, 회의 등
-        - PRODUCT: 제품, 서비스, 기술 등
-        - OTHER: 기타 중요 개체
-        
-        다음 형식의 JSON으로 응답해주세요:
-        ```json
-        {{
-            "entities": [
-                {{
-                    "id": "E1",
-                    "name": "김민수",
-                    "type": "PERSON",
-                    "description": "서울대학교 컴퓨터공학과 교수"
-                }},
-                ...
-            ],
-            "relations": [
-                {{
-                    "source": "E1",
-                    "target": "E2",
-                    "relation": "소속",
-                    "sentence": "김민수 교수는 서울대학교 컴퓨터공학과 소속이다."
-                }},
-                ...
-            ]
-        }}
-        ```
+        if len(text) <= self.max_chunk_chars:
+            return [text]
+        
+        chunks = []
+        current = ""
+        for paragraph in _PARAGRAPH_SPLIT.split(text.strip()):
+            if len(paragraph) <= self.max_chunk_chars:
+                pieces = [(paragraph, "\n")]
+            else:
+                pieces = [(sentence, " ") for sentence in _SENTENCE_SPLIT.split(paragraph)]
+                # 문단의 첫 문장은 앞 청크와 줄바꿈으로 구분
+                pieces[0] = (pieces[0][0], "\n")
+            for piece, separator in pieces:
+                if not piece:
+                    continue
+                if current and len(current) + len(separator) + len(piece) > self.max_chunk_chars:
+                    chunks.append(current)
+                    current = piece
+                else:
+                    current = f"{current}{separator}{piece}" if current else piece
+        if current:
+            chunks.append(current)
+        return chunks
+    
+    def _merge_results(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        청크별 추출 결과를 병합 (이름과 유형이 같은 개체는 하나로 합치고 ID를 다시 부여)
         
-        분석할 텍스트:
-        ---
-        {text}
-        ---
+        매개변수:
+            results (list): 청크별 추출 결과 목록
+            
+        반환값:
+            dict: 병합된 개체와 관계 정보
+                  (실패한 청크가 있으면 첫 오류 메시지 'error', 실패 수 'failed_chunks', 전체 수 'chunk_count' 포함)
+        """
+        entities = []
+        relations = []
+        entity_ids = {}
+        seen_relations = set()
+        for result in results:
+            # 청크 내부 ID -> 병합 후 ID
+            local_ids = {}
+            for entity in result.get("entities", []):
+                # 공백 차이만 있는 이름은 같은 개체로 취급 (정규화 후 해시 조회 한 번으로 중복 판별)
+                entity_key = (" ".join(str(entity.get("name", "")).split()), entity.get("type"))
+                if entity_key not in entity_ids:
+                    entity_ids[entity_key] = f"E{len(entities) + 1}"
+                    entities.append({**entity, "id": entity_ids[entity_key]})
+                local_ids[entity.get("id")] = entity_ids[entity_key]
+            for relation in result.get("relations", []):
+                source = local_ids.get(relation.get("source"))
+                target = local_ids.get(relation.get("target"))
+                relation_key = (source, target, relation.get("relation"))
+                if source is None or target is None or relation_key in seen_relations:
+                    continue
+                seen_relations.add(relation_key)
+                relations.append({**relation, "source": source, "target": target})
+        merged = {"entities": entities, "relations": relations}
+        errors = [result["error"] for result in results if result.get("error")]
+        if errors:
+            merged.update(error=errors[0], failed_chunks=len(errors), chunk_count=len(results))
+        return merged
+    
+    def _extract_with_llm(self, text):
+        """
+        Gemini 모델을 사용하여 개체 및 관계 추출
         
-        중요: 응답은 반드시 위에 명시된 JSON 형식만 포함해야 합니다. 다른 텍스트나 설명은 포함하지 마세요.
+        매개변수:
+            text (str): 분석할 텍스트
+            
+        반환값:
+            dict: 추출된 개체와 관계 정보 (호출이나 응답 해석에 실패하면 'error'에 오류 메시지 포함)
         """
+        # 고정된 프롬프트 앞뒤 부분을 이어 붙여 호출마다 긴 템플릿을 다시 포맷하지 않음
+        prompt = self._prompt_prefix + text + self._prompt_suffix
+        
+        # 동일한 요청의 결과가 캐시에 있으면 API 호출 생략
+        cache_key = None
+        if self.cache:
+            cache_key = ExtractionCache.make_key(self.model_name, self.temperature, PROMPT_VERSION, text)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
         
         try:
             response = self.model.generate_content(prompt)
             response_text = response.text
             
-            # JSON 추출
-            json_match = re.search(r'```json\n(.*?)\n```', response_text, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(1)
-            else:
-                json_match = re.search(r'({.*})', response_text, re.DOTALL)
-                if json_match:
-                    json_str = json_match.group(1)
-                else:
-                    json_str = response_text
+            # JSON 추출 (첫 중괄호부터 객체 하나를 해석하고 뒤따르는 코드 블록 표시 등은 무시)
+            start = response_text.find('{')
+            if start < 0:
+                raise ValueError("응답에 JSON 객체가 없습니다")
+            end = response_text.rfind('}') + 1
+            try:
+                data = orjson.loads(response_text[start:end])
+            except orjson.JSONDecodeError:
+                # 마지막 중괄호까지가 올바른 JSON이 아니면 (뒤에 다른 중괄호 텍스트가 있는 경우 등) 객체 하나만 해석
+                data, _ = _JSON_DECODER.raw_decode(response_text, start)
             
-            data = json.loads(json_str)
+            # 개체와 관계가 모두 있는 정상 응답만 캐시
+            if cache_key and "entities" in data and "relations" in data:
+                self.cache.set(cache_key, data, self.model_name)
             
             if "entities" not in data:
                 data["entities"] = []
@@ -162,25 +391,39 @@ class KnowledgeGraphExtractor:
                 
         except Exception as e:
             print(f"Gemini API 호출 중 오류 발생: {e}")
-            return {"entities": [], "relations": []}
+            # 빈 결과와 구분할 수 있도록 실패 표시를 남김 (병합 후에도 실패가 드러나도록)
+            return {"entities": [], "relations": [], "error": str(e)}
     
-    def _save_jsonl(self, data: Dict[str, Any], output_dir: str) -> str:
+    def _to_jsonl(self, data: Dict[str, Any]) -> bytes:
         """
-        데이터를 JSONL 형식으로 저장
+        데이터를 JSONL 형식의 UTF-8 바이트로 변환
         
         매개변수:
-            data (dict): 저장할 데이터 (entities, relations 포함)
+            data (dict): 변환할 데이터 (entities, relations 포함)
+            
+        반환값:
+            bytes: JSONL 형식의 데이터 (한 줄에 개체 또는 관계 하나)
+        """
+        lines = [orjson.dumps({"type": "entity", "data": entity}, option=orjson.OPT_APPEND_NEWLINE)
+                 for entity in data.get("entities", [])]
+        lines += [orjson.dumps({"type": "relation", "data": relation}, option=orjson.OPT_APPEND_NEWLINE)
+                  for relation in data.get("relations", [])]
+        return b"".join(lines)
+    
+    def _save_jsonl(self, jsonl_bytes: bytes, output_dir: str) -> str:
+        """
+        JSONL 데이터를 파일로 저장
+        
+        매개변수:
+            jsonl_bytes (bytes): 저장할 JSONL 데이터
             output_dir (str): 저장 경로
             
         반환값:
             str: 생성된 JSONL 파일 경로
         """
         jsonl_path = os.path.join(output_dir, "extracted_data.jsonl")
-        with open(jsonl_path, 'w', encoding='utf-8') as f:
-            for entity in data.get("entities", []):
-                f.write(json.dumps({"type": "entity", "data": entity}, ensure_ascii=False) + "\n")
-            for relation in data.get("relations", []):
-                f.write(json.dumps({"type": "relation", "data": relation}, ensure_ascii=False) + "\n")
+        with open(jsonl_path, 'wb') as f:
+            f.write(jsonl_bytes)
         return jsonl_path
     
     def _create_dataframes(self, data: Dict[str, Any]) -> Dict[str, pd.DataFrame]:
@@ -193,27 +436,35 @@ class KnowledgeGraphExtractor:
         반환값:
             dict: 'entities', 'relations', 'relations_with_info' DataFrame 사전.
         """
-        # 개체 DataFrame
         entities = data.get("entities", [])
-        entities_df = pd.DataFrame(entities).fillna("")
-        if "description" not in entities_df.columns:
-            entities_df["description"] = ""
-        # 관계 DataFrame
         relations = data.get("relations", [])
-        relations_df = pd.DataFrame(relations).fillna("")
-        # 관계 정보에 개체 정보 병합
+        # 개체와 관계가 모두 없으면 DataFrame을 만들지 않음
+        # (extract 경로는 _build_result에서 이미 걸러지므로, 이 메서드를 직접 호출하는 경우를 위한 처리)
+        if not entities and not relations:
+            return {
+                "entities": _EMPTY_ENTITIES_DF.copy(),
+                "relations": _EMPTY_RELATIONS_DF.copy(),
+                "relations_with_info": _EMPTY_RELATION_INFO_DF.copy()
+            }
+        
+        # 개체 DataFrame (모든 컬럼을 Arrow 기반 문자열로 저장)
+        entities_df = pd.DataFrame.from_records(entities, columns=ENTITY_COLUMNS).fillna("").astype(STRING_DTYPE)
+        # 관계 DataFrame
+        relations_df = pd.DataFrame.from_records(relations, columns=RELATION_COLUMNS).fillna("").astype(STRING_DTYPE)
+        # 관계 정보에 개체 정보 추가 (개체 ID -> 이름/유형 사전으로 매핑)
         if not relations_df.empty and not entities_df.empty:
-            source_info = entities_df[["id", "name", "type"]].copy()
-            source_info.columns = ["source", "source_name", "source_type"]
-            merged_df = relations_df.merge(source_info, on="source", how="left")
-            target_info = entities_df[["id", "name", "type"]].copy()
-            target_info.columns = ["target", "target_name", "target_type"]
-            merged_df = merged_df.merge(target_info, on="target", how="left")
-            merged_df.rename(columns={"source": "source_id", "target": "target_id"}, inplace=True)
-            rel_info_columns = ["source_id", "source_name", "source_type", "target_id", "target_name", "target_type", "relation", "sentence"]
-            relations_with_info_df = merged_df[rel_info_columns]
+            name_map = dict(zip(entities_df["id"], entities_df["name"]))
+            type_map = dict(zip(entities_df["id"], entities_df["type"]))
+            relations_with_info_df = relations_df.assign(
+                source_id=relations_df["source"],
+                source_name=relations_df["source"].map(name_map),
+                source_type=relations_df["source"].map(type_map),
+                target_id=relations_df["target"],
+                target_name=relations_df["target"].map(name_map),
+                target_type=relations_df["target"].map(type_map)
+            )[RELATION_INFO_COLUMNS].astype(STRING_DTYPE)
         else:
-            relations_with_info_df = pd.DataFrame(columns=["source_id", "source_name", "source_type", "target_id", "target_name", "target_type", "relation", "sentence"])
+            relations_with_info_df = _EMPTY_RELATION_INFO_DF.copy()
         return {
             "entities": entities_df,
             "relations": relations_df,
@@ -232,20 +483,57 @@ class KnowledgeGraphExtractor:
             dict: 저장된 파일 경로 사전
         """
         paths = {}
+        # 저장할 데이터가 하나도 없으면 바로 반환
+        if all(df.empty for df in dataframes.values()):
+            return paths
         if not dataframes["entities"].empty:
             entity_csv = os.path.join(output_dir, "entities.csv")
-            dataframes["entities"].to_csv(entity_csv, index=False, encoding='utf-8-sig')
+            self._write_csv(dataframes["entities"], entity_csv)
             paths["entities_csv"] = entity_csv
         if not dataframes["relations"].empty:
             relations_csv = os.path.join(output_dir, "relations.csv")
-            dataframes["relations"].to_csv(relations_csv, index=False, encoding='utf-8-sig')
+            self._write_csv(dataframes["relations"], relations_csv)
             paths["relations_csv"] = relations_csv
         if not dataframes["relations_with_info"].empty:
             rel_info_csv = os.path.join(output_dir, "relations_with_info.csv")
-            dataframes["relations_with_info"].to_csv(rel_info_csv, index=False, encoding='utf-8-sig')
+            self._write_csv(dataframes["relations_with_info"], rel_info_csv)
             paths["relations_with_info_csv"] = rel_info_csv
         return paths
     
+    def _write_csv(self, df: pd.DataFrame, csv_path: str) -> None:
+        """
+        DataFrame을 CSV 파일로 저장 (엑셀에서 한글이 깨지지 않도록 UTF-8 BOM 포함)
+        - 작은 DataFrame은 csv 모듈로, 큰 DataFrame은 PyArrow CSV writer로 저장합니다.
+        - 두 방식 모두 LF 줄바꿈에 모든 값을 따옴표로 감싸므로 행 수와 관계없이 같은 형식의 파일이 만들어집니다.
+          (추출기의 DataFrame은 모두 문자열 컬럼이며, 빈 값은 빈 문자열로 저장)
+        
+        매개변수:
+            df (DataFrame): 저장할 DataFrame
+            csv_path (str): 저장할 CSV 파일 경로
+        """
+        df = df.fillna("")
+        if len(df) < SMALL_CSV_ROWS:
+            self._save_small_csv(df.to_dict("records"), csv_path, list(df.columns))
+            return
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        with pa.OSFile(csv_path, 'wb') as sink:
+            sink.write(UTF8_BOM)
+            pa_csv.write_csv(table, sink)
+    
+    def _save_small_csv(self, rows: List[Dict[str, Any]], csv_path: str, fieldnames: List[str]) -> None:
+        """
+        레코드 목록을 csv.DictWriter로 저장 (UTF-8 BOM 포함, PyArrow CSV writer와 같은 형식)
+        
+        매개변수:
+            rows (list): 저장할 레코드 목록
+            csv_path (str): 저장할 CSV 파일 경로
+            fieldnames (list): 컬럼 순서
+        """
+        with open(csv_path, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames, quoting=csv.QUOTE_ALL, lineterminator="\n")
+            writer.writeheader()
+            writer.writerows(rows)
+    
     def _create_static_graph(self, G, output_file: str) -> str:
         """
         Matplotlib으로 정적 그래프 생성 (PNG)
@@ -260,6 +548,8 @@ class KnowledgeGraphExtractor:
         if len(G) == 0:
             return ""
         
+        import numpy as np
+        import networkx as nx
         import matplotlib.pyplot as plt
         plt.figure(figsize=(14, 12))
         
@@ -272,32 +562,26 @@ class KnowledgeGraphExtractor:
             "OTHER": "lightgray"
         }
         
-        node_colors = []
-        node_sizes = []
-        for node in G.nodes():
-            node_type = G.nodes[node].get("type", "OTHER")
-            node_colors.append(color_map.get(node_type, "lightgray"))
-            node_size = 400 + (120 * G.degree[node])
-            node_sizes.append(node_size)
+        # 노드 순서대로 색상/크기 배열을 한 번에 생성
+        nodes = list(G.nodes())
+        node_colors = np.array([color_map.get(G.nodes[node].get("type", "OTHER"), "lightgray") for node in nodes])
+        degrees = np.fromiter((degree for _, degree in G.degree(nodes)), dtype=np.int32, count=len(nodes))
+        node_sizes = 400 + 120 * degrees
         
         pos = nx.spring_layout(G, k=0.7, seed=42)
-        nx.draw_networkx_nodes(G, pos, node_size=node_sizes, node_color=node_colors, alpha=0.9, edgecolors='black', linewidths=1.0)
+        nx.draw_networkx_nodes(G, pos, nodelist=nodes, node_size=node_sizes, node_color=node_colors, alpha=0.9, edgecolors='black', linewidths=1.0)
         nx.draw_networkx_edges(G, pos, width=1.5, alpha=0.8, edge_color='gray', arrowsize=20)
         
+        # 라벨을 한 번에 그리기 (노드/엣지마다 plt.text를 호출하지 않음)
         labels = {node: G.nodes[node].get("name", node) for node in G.nodes()}
-        for node, label in labels.items():
-            x, y = pos[node]
-            plt.text(x, y, label, fontsize=12, fontweight='bold', fontproperties=plt.rcParams['font.family'],
-                     ha='center', va='center',
-                     bbox=dict(facecolor='white', alpha=0.8, edgecolor='none', boxstyle='round,pad=0.3'))
-        
-        for u, v, data in G.edges(data=True):
-            relation = data.get("relation", "")
-            edge_x = (pos[u][0] + pos[v][0]) / 2.0
-            edge_y = (pos[u][1] + pos[v][1]) / 2.0
-            plt.text(edge_x, edge_y, relation, fontsize=10, fontweight='bold', fontproperties=plt.rcParams['font.family'],
-                     ha='center', va='center',
-                     bbox=dict(facecolor='white', alpha=0.8, edgecolor='gray', boxstyle='round,pad=0.2'))
+        nx.draw_networkx_labels(G, pos, labels=labels, font_size=12, font_weight='bold',
+                                font_family=plt.rcParams['font.family'],
+                                bbox=dict(facecolor='white', alpha=0.8, edgecolor='none', boxstyle='round,pad=0.3'))
+        
+        edge_labels = {(u, v): data.get("relation", "") for u, v, data in G.edges(data=True)}
+        nx.draw_networkx_edge_labels(G, pos, edge_labels=edge_labels, font_size=10, font_weight='bold',
+                                     font_family=plt.rcParams['font.family'],
+                                     bbox=dict(facecolor='white', alpha=0.8, edgecolor='gray', boxstyle='round,pad=0.2'))
         
         legend_elements = [ 
             plt.Line2D([0], [0], marker='o', color='w', markerfacecolor=color, markersize=12, label=label)
@@ -1,9 +1,11 @@
+import os
 import base64
-import pandas as pd
+import orjson
 from io import BytesIO
-import streamlit as st
-import numpy as np
 import re
+from functools import lru_cache
+from itertools import chain
+from collections import Counter
 
 # 개체 유형별 색상 매핑
 COLOR_MAP = {
@@ -15,6 +17,17 @@ COLOR_MAP = {
     "OTHER": "#7f8c8d"        # 회색
 }
 
+# 개체 유형별 한국어 라벨
+ENTITY_TYPE_LABELS = {
+    "PERSON": "인물",
+    "ORGANIZATION": "조직",
+    "LOCATION": "장소",
+    "EVENT": "이벤트",
+    "PRODUCT": "제품",
+    "OTHER": "기타"
+}
+
+@lru_cache(maxsize=16)
 def get_color_by_entity_type(entity_type):
     """
     개체 유형에 따른 색상을 반환합니다.
@@ -27,6 +40,21 @@ def get_color_by_entity_type(entity_type):
     """
     return COLOR_MAP.get(entity_type, COLOR_MAP["OTHER"])
 
+# 사이드바 범례용 개체 유형 라벨 HTML (모듈 로드 시 한 번만 생성)
+ENTITY_LABELS_HTML = {
+    entity_type: f'<div class="entity-label" style="background-color: {get_color_by_entity_type(entity_type)}">{label}</div>'
+    for entity_type, label in ENTITY_TYPE_LABELS.items()
+}
+
+@lru_cache(maxsize=8)
+def _cached_b64(path, mtime_ns, size):
+    """
+    파일 내용을 base64로 인코딩 (경로, 수정 시각, 크기가 같으면 캐시된 값 사용)
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    return base64.b64encode(data).decode()
+
 def get_base64_of_bin_file(bin_file):
     """
     바이너리 파일을 base64로 인코딩하여 반환합니다.
@@ -37,19 +65,15 @@ def get_base64_of_bin_file(bin_file):
     반환값:
         str: base64로 인코딩된 문자열
     """
-    with open(bin_file, 'rb') as f:
-        data = f.read()
-    return base64.b64encode(data).decode()
+    stat = os.stat(bin_file)
+    return _cached_b64(bin_file, stat.st_mtime_ns, stat.st_size)
 
-def set_background(png_file):
+@lru_cache(maxsize=8)
+def _background_style(bin_str):
     """
-    Streamlit 앱의 배경 이미지를 설정합니다.
-    
-    매개변수:
-        png_file (str): 이미지 파일 경로
+    배경 이미지 스타일 블록 생성 (같은 이미지면 동일한 문자열 객체를 재사용)
     """
-    bin_str = get_base64_of_bin_file(png_file)
-    page_bg_img = '''
+    return '''
     <style>
     .stApp {
         background-image: url("data:image/png;base64,%s");
@@ -57,6 +81,18 @@ def set_background(png_file):
     }
     </style>
     ''' % bin_str
+
+def set_background(png_file):
+    """
+    Streamlit 앱의 배경 이미지를 설정합니다.
+    
+    매개변수:
+        png_file (str): 이미지 파일 경로
+    """
+    # streamlit은 배경 설정에만 필요하므로 사용할 때 불러옴
+    import streamlit as st
+    
+    page_bg_img = _background_style(get_base64_of_bin_file(png_file))
     st.markdown(page_bg_img, unsafe_allow_html=True)
 
 def dataframe_to_excel_bytes(df_dict):
@@ -69,13 +105,26 @@ def dataframe_to_excel_bytes(df_dict):
     반환값:
         bytes: Excel 파일의 바이트 데이터
     """
+    import xlsxwriter
+    
     output = BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        for sheet_name, df in df_dict.items():
-            df.to_excel(writer, sheet_name=sheet_name, index=False)
+    # constant_memory 모드는 행 순서대로만 쓸 수 있으므로 (pandas to_excel은 열 순서로 기록)
+    # 헤더와 각 행을 write_row로 직접 기록
+    # 날짜/시간 값은 일련번호가 아닌 날짜로 보이도록 pandas ExcelWriter와 같은 기본 서식 지정
+    workbook = xlsxwriter.Workbook(output, {
+        'constant_memory': True,
+        'strings_to_urls': False,
+        'default_date_format': 'yyyy-mm-dd hh:mm:ss'
+    })
+    for sheet_name, df in df_dict.items():
+        worksheet = workbook.add_worksheet(sheet_name)
+        worksheet.write_row(0, 0, [str(column) for column in df.columns])
+        values = df.astype(object).where(df.notna(), None)
+        for row, record in enumerate(values.itertuples(index=False, name=None), start=1):
+            worksheet.write_row(row, 0, record)
+    workbook.close()
     
-    output.seek(0)
-    return output.read()
+    return output.getvalue()
 
 def find_entities_in_text(text, entities):
     """
@@ -88,21 +137,24 @@ def find_entities_in_text(text, entities):
     반환값:
         str: 하이라이팅된 HTML 텍스트
     """
-    result = text
-    # 개체 이름 기준으로 정렬 (긴 이름이 먼저 대체되도록)
+    if not entities:
+        return text
+
+    # 개체 이름 기준으로 정렬 (교대 패턴에서 긴 이름이 먼저 일치하도록)
     sorted_entities = sorted(entities, key=lambda x: len(x["name"]), reverse=True)
-    
+    color_by_name = {}
     for entity in sorted_entities:
-        name = entity["name"]
-        entity_type = entity["type"]
-        color = get_color_by_entity_type(entity_type)
-        
-        # 정규표현식 패턴 (단어 경계 고려)
-        pattern = r'(\b' + re.escape(name) + r'\b)'
-        replacement = f'<span style="background-color: {color}; padding: 2px 4px; border-radius: 3px;">{name}</span>'
-        result = re.sub(pattern, replacement, result)
-    
-    return result
+        color_by_name.setdefault(entity["name"], get_color_by_entity_type(entity["type"]))
+
+    # 모든 개체 이름을 하나의 정규표현식으로 묶어 텍스트를 한 번만 탐색
+    pattern = re.compile(r'\b(' + '|'.join(re.escape(name) for name in color_by_name) + r')\b')
+
+    def replace(match):
+        name = match.group(1)
+        color = color_by_name[name]
+        return f'<span style="background-color: {color}; padding: 2px 4px; border-radius: 3px;">{name}</span>'
+
+    return pattern.sub(replace, text)
 
 def entity_stats(entities):
     """
@@ -114,14 +166,7 @@ def entity_stats(entities):
     반환값:
         dict: 유형별 개수
     """
-    stats = {}
-    for entity in entities:
-        entity_type = entity["type"]
-        if entity_type in stats:
-            stats[entity_type] += 1
-        else:
-            stats[entity_type] = 1
-    return stats
+    return dict(Counter(entity["type"] for entity in entities))
 
 def relation_stats(relations):
     """
@@ -133,14 +178,7 @@ def relation_stats(relations):
     반환값:
         dict: 유형별 개수
     """
-    stats = {}
-    for relation in relations:
-        relation_type = relation["relation"]
-        if relation_type in stats:
-            stats[relation_type] += 1
-        else:
-            stats[relation_type] = 1
-    return stats
+    return dict(Counter(relation["relation"] for relation in relations))
 
 def get_jsonl_text(entities, relations):
     """
@@ -153,12 +191,8 @@ def get_jsonl_text(entities, relations):
     반환값:
         str: JSONL 형식의 텍스트
     """
-    jsonl_lines = []
-    
-    for entity in entities:
-        jsonl_lines.append(json.dumps({"type": "entity", "data": entity}, ensure_ascii=False))
-    
-    for relation in relations:
-        jsonl_lines.append(json.dumps({"type": "relation", "data": relation}, ensure_ascii=False))
-    
-    return '\n'.join(jsonl_lines)
+    records = chain(
+        ({"type": "entity", "data": entity} for entity in entities),
+        ({"type": "relation", "data": relation} for relation in relations)
+    )
+    return b'\n'.join(orjson.dumps(record) for record in records).decode('utf-8')